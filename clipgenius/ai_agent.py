@@ -2,59 +2,213 @@
 AI Agent for conversational interactions with users
 """
 
+import asyncio
+import hashlib
 import json
-from typing import Dict, List, Optional, Any
-from openai import OpenAI
-from .utils import is_youtube_url, format_duration, format_file_size, get_openai_api_key
+import textwrap
+from collections import OrderedDict, deque
+from string import Template
+from typing import Dict, Optional, Any, Tuple
+import httpx
+from openai import AsyncOpenAI
+from .utils import is_youtube_url, format_duration, format_file_size, get_openai_api_key, get_openai_model
+
+
+def _prompt(text: str) -> str:
+    """Normalize the indentation of a prompt literal once, at import time"""
+    return textwrap.dedent(text).strip()
+
+
+# Prompt templates are built once at import; per-call work is only substitution
+_GREET_TPL = Template(_prompt("""
+    You are ClipGenius, a friendly AI assistant that helps users download videos.
+
+    The user has provided this URL: $url
+
+    Please:
+    1. Greet the user warmly
+    2. Identify what platform this appears to be from
+    3. Briefly explain what you'll help them with
+    4. Keep it conversational and helpful
+
+    Keep the response concise but friendly.
+"""))
+
+_SUMMARY_TPL = Template(_prompt("""
+    You are ClipGenius. Please create a friendly, conversational summary of this video:
+
+    Title: $title
+    Uploader: $uploader
+    Duration: $duration
+    Views: $views views
+    Description: $description
+
+    Make it engaging and highlight the most interesting aspects. Keep it concise but informative.
+    Respond with JSON: {"summary": "..."}
+"""))
+
+_PREFERENCES_PROMPT = _prompt("""
+    You are ClipGenius. In a short, friendly message, invite the user to choose their download options.
+
+    They answer on ONE line using these words, in any order:
+    - "audio" for audio only (video is the default)
+    - a quality: "best", "worst" or a height such as "720p" (best is the default)
+    - "subs" to also get subtitles
+    - "thumb" to also get the thumbnail
+
+    Give one or two examples such as "720p subs thumb" or "audio", and mention that a blank
+    answer means video in the best quality. A custom filename is asked for separately afterwards.
+    Do not ask separate yes/no questions or number a list of questions.
+""")
+
+_ERROR_TPL = Template(_prompt("""
+    You are ClipGenius, helping a user who encountered this error while trying to download a video:
+
+    Error: $error_message
+    URL: $url
+
+    Please:
+    1. Explain what might have gone wrong in simple terms
+    2. Suggest 2-3 practical solutions they can try
+    3. Stay encouraging and helpful
+    4. If it's a common issue, mention that
+
+    Keep it conversational and supportive.
+"""))
+
+_OFFER_TPL = Template(_prompt("""
+    You are ClipGenius. The user just downloaded a video successfully.
+
+    Available additional resources:
+    - Subtitles: $subtitles
+    - Thumbnail: $thumbnail
+
+    Offer to download these additional resources in a friendly, conversational way.
+    Don't be pushy - just let them know what's available.
+"""))
+
+
+def _summary_from_reply(reply: str) -> str:
+    """Read the summary out of a JSON-mode reply, tolerating one cut off at the token limit"""
+    # A reply cut off inside the summary is only missing its closing quote and brace
+    for text in (reply, reply + '"}'):
+        try:
+            return json.loads(text)["summary"].strip()
+        except (ValueError, KeyError, TypeError, AttributeError):
+            continue
+    return reply
+
+
+# One connection pool and one event loop shared by every agent in the process, so
+# back-to-back requests reuse kept-alive TLS connections instead of reconnecting.
+# The pool is bound to the loop it is used on, hence they are shared together.
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+_http_client: Optional[httpx.AsyncClient] = None
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _shared_http_client() -> httpx.AsyncClient:
+    """Return the process-wide HTTP client used for OpenAI requests"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(limits=_HTTP_LIMITS, timeout=httpx.Timeout(60.0, connect=10.0))
+    return _http_client
+
+
+def _run(coro):
+    """Run a coroutine to completion on the shared event loop"""
+    global _event_loop
+    if _event_loop is None:
+        _event_loop = asyncio.new_event_loop()
+    return _event_loop.run_until_complete(coro)
+
+
+# Completed replies keyed by (model, prompt digest, temperature bucket, JSON mode), shared
+# by every agent in the process and evicted least-recently-used first
+_RESPONSE_CACHE_SIZE = 256
+_response_cache: "OrderedDict[Tuple[str, str, float, bool], str]" = OrderedDict()
 
 
 class AIAgent:
     """AI agent for conversational video download assistance"""
     
+    HISTORY_SIZE = 64
+    
+    # Default chat model (overridable via CLIPGENIUS_MODEL) and per-prompt reply caps;
+    # replies are short, and decode time grows with every allowed token
+    MODEL = "gpt-4o-mini"
+    MAX_TOKENS = {"greet": 120, "summary": 220, "prefs": 180, "offer": 140, "error": 220}
+    
     def __init__(self):
         api_key = get_openai_api_key()
         if not api_key:
             print("⚠️  Warning: No OpenAI API key found. Set OPENAI_API_KEY environment variable for AI features.")
-            self.client = None
+            self.aclient = None
         else:
-            self.client = OpenAI(api_key=api_key)
+            self.aclient = AsyncOpenAI(api_key=api_key, http_client=_shared_http_client())
+        
+        self.model = get_openai_model() or self.MODEL
         
-        self.conversation_history = []
+        # Only the most recent turns are kept so long sessions don't grow without bound
+        self.conversation_history = deque(maxlen=self.HISTORY_SIZE)
     
     def is_available(self) -> bool:
         """Check if AI agent is available (API key configured)"""
-        return self.client is not None
+        return self.aclient is not None
+    
+    async def _complete(self, prompt: str, max_tokens: int, temperature: float = 0.7,
+                        json_mode: bool = False) -> str:
+        """Send a single-prompt chat completion and return the reply text"""
+        return await self._cached_completion(prompt, self.model, max_tokens, temperature, json_mode)
+    
+    async def _cached_completion(self, prompt: str, model: str, max_tokens: int, temperature: float,
+                                 json_mode: bool = False) -> str:
+        """Return a cached reply for an identical prompt, requesting it on a miss"""
+        key = (model, hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest(), round(temperature, 1), json_mode)
+        cached = _response_cache.get(key)
+        if cached is not None:
+            _response_cache.move_to_end(key)
+            return cached
+        
+        extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+        response = await self.aclient.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **extra
+        )
+        reply = response.choices[0].message.content.strip()
+        
+        _response_cache[key] = reply
+        if len(_response_cache) > _RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+        return reply
+    
+    def introduce(self, url: str, video_info: Dict[str, Any]) -> Tuple[str, str]:
+        """Generate the greeting and the video summary concurrently"""
+        return _run(self.introduce_async(url, video_info))
+    
+    async def introduce_async(self, url: str, video_info: Dict[str, Any]) -> Tuple[str, str]:
+        """Async variant of introduce"""
+        greeting, summary = await asyncio.gather(
+            self.greet_user_async(url),
+            self.summarize_video_metadata_async(video_info)
+        )
+        return greeting, summary
     
     def greet_user(self, url: str) -> str:
         """Generate a greeting message and analyze the URL"""
+        return _run(self.greet_user_async(url))
+    
+    async def greet_user_async(self, url: str) -> str:
+        """Async variant of greet_user"""
         if not self.is_available():
             return self._fallback_greeting(url)
         
         try:
-            platform = "YouTube" if is_youtube_url(url) else "this platform"
-            
-            prompt = f"""
-            You are ClipGenius, a friendly AI assistant that helps users download videos. 
-            
-            The user has provided this URL: {url}
-            
-            Please:
-            1. Greet the user warmly
-            2. Identify what platform this appears to be from
-            3. Briefly explain what you'll help them with
-            4. Keep it conversational and helpful
-            
-            Keep the response concise but friendly.
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=200,
-                temperature=0.7
-            )
-            
-            greeting = response.choices[0].message.content.strip()
+            prompt = _GREET_TPL.substitute(url=url)
+            greeting = await self._complete(prompt, max_tokens=self.MAX_TOKENS["greet"])
             self.conversation_history.append({"role": "assistant", "content": greeting})
             return greeting
             
@@ -79,6 +233,10 @@ Let's get started! 🚀
     
     def summarize_video_metadata(self, video_info: Dict[str, Any]) -> str:
         """Summarize video metadata in a user-friendly way"""
+        return _run(self.summarize_video_metadata_async(video_info))
+    
+    async def summarize_video_metadata_async(self, video_info: Dict[str, Any]) -> str:
+        """Async variant of summarize_video_metadata"""
         if not self.is_available():
             return self._fallback_video_summary(video_info)
         
@@ -90,26 +248,16 @@ Let's get started! 🚀
             view_count = video_info.get('view_count', 0)
             description = video_info.get('description', '')[:300] + '...' if video_info.get('description') else 'No description'
             
-            prompt = f"""
-            You are ClipGenius. Please create a friendly, conversational summary of this video:
-            
-            Title: {title}
-            Uploader: {uploader}
-            Duration: {format_duration(duration)}
-            Views: {view_count:,} views
-            Description: {description}
-            
-            Make it engaging and highlight the most interesting aspects. Keep it concise but informative.
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=300,
-                temperature=0.7
+            prompt = _SUMMARY_TPL.substitute(
+                title=title,
+                uploader=uploader,
+                duration=format_duration(duration),
+                views=f"{view_count:,}",
+                description=description
             )
             
-            summary = response.choices[0].message.content.strip()
+            reply = await self._complete(prompt, max_tokens=self.MAX_TOKENS["summary"], json_mode=True)
+            summary = _summary_from_reply(reply)
             self.conversation_history.append({"role": "assistant", "content": summary})
             return summary
             
@@ -136,32 +284,15 @@ Ready to download! 🎬
     
     def ask_about_preferences(self) -> str:
         """Ask user about their download preferences"""
+        return _run(self.ask_about_preferences_async())
+    
+    async def ask_about_preferences_async(self) -> str:
+        """Async variant of ask_about_preferences"""
         if not self.is_available():
             return self._fallback_preferences_question()
         
         try:
-            prompt = """
-            You are ClipGenius. Ask the user about their download preferences in a conversational way.
-            
-            Ask about:
-            1. Video quality/format preferences
-            2. Whether they want video or just audio
-            3. If they want subtitles
-            4. If they want thumbnails
-            5. Custom filename preferences
-            
-            Make it feel like a natural conversation, not a formal questionnaire.
-            Keep it friendly and helpful.
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=250,
-                temperature=0.7
-            )
-            
-            question = response.choices[0].message.content.strip()
+            question = await self._complete(_PREFERENCES_PROMPT, max_tokens=self.MAX_TOKENS["prefs"])
             self.conversation_history.append({"role": "assistant", "content": question})
             return question
             
@@ -172,46 +303,28 @@ Ready to download! 🎬
     def _fallback_preferences_question(self) -> str:
         """Fallback preferences question when AI is not available"""
         return """
-🎯 Let me know your preferences:
+🎯 Let me know your preferences on one line:
 
-1. Do you want video + audio or just audio? (video/audio)
-2. What quality do you prefer? (best/720p/480p/etc.)
-3. Would you like subtitles? (yes/no)
-4. Want to download the thumbnail too? (yes/no)
-5. Any custom filename preference? (leave blank for default)
+• "audio" for audio only (video is the default)
+• a quality: best, worst, 720p, 480p... (best is the default)
+• "subs" for subtitles, "thumb" for the thumbnail
 
-Just answer with your choices! 😊
+For example "720p subs thumb" or "audio". Leave it blank for video in the best quality. 😊
 """
     
     def suggest_error_solution(self, error_message: str, url: str) -> str:
         """Suggest solutions for download errors"""
+        return _run(self.suggest_error_solution_async(error_message, url))
+    
+    async def suggest_error_solution_async(self, error_message: str, url: str) -> str:
+        """Async variant of suggest_error_solution"""
         if not self.is_available():
             return self._fallback_error_solution(error_message)
         
         try:
-            prompt = f"""
-            You are ClipGenius, helping a user who encountered this error while trying to download a video:
-            
-            Error: {error_message}
-            URL: {url}
+            prompt = _ERROR_TPL.substitute(error_message=error_message, url=url)
             
-            Please:
-            1. Explain what might have gone wrong in simple terms
-            2. Suggest 2-3 practical solutions they can try
-            3. Stay encouraging and helpful
-            4. If it's a common issue, mention that
-            
-            Keep it conversational and supportive.
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=300,
-                temperature=0.7
-            )
-            
-            suggestion = response.choices[0].message.content.strip()
+            suggestion = await self._complete(prompt, max_tokens=self.MAX_TOKENS["error"])
             self.conversation_history.append({"role": "assistant", "content": suggestion})
             return suggestion
             
@@ -235,6 +348,10 @@ Don't worry, let's try again! 🔄
     
     def offer_related_resources(self, video_info: Dict[str, Any]) -> str:
         """Offer to download related resources"""
+        return _run(self.offer_related_resources_async(video_info))
+    
+    async def offer_related_resources_async(self, video_info: Dict[str, Any]) -> str:
+        """Async variant of offer_related_resources"""
         if not self.is_available():
             return self._fallback_resources_offer()
         
@@ -242,25 +359,12 @@ Don't worry, let's try again! 🔄
             has_subtitles = bool(video_info.get('subtitles') or video_info.get('automatic_captions'))
             has_thumbnail = bool(video_info.get('thumbnail'))
             
-            prompt = f"""
-            You are ClipGenius. The user just downloaded a video successfully.
-            
-            Available additional resources:
-            - Subtitles: {'Available' if has_subtitles else 'Not available'}
-            - Thumbnail: {'Available' if has_thumbnail else 'Not available'}
-            
-            Offer to download these additional resources in a friendly, conversational way.
-            Don't be pushy - just let them know what's available.
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=200,
-                temperature=0.7
+            prompt = _OFFER_TPL.substitute(
+                subtitles='Available' if has_subtitles else 'Not available',
+                thumbnail='Available' if has_thumbnail else 'Not available'
             )
             
-            offer = response.choices[0].message.content.strip()
+            offer = await self._complete(prompt, max_tokens=self.MAX_TOKENS["offer"])
             self.conversation_history.append({"role": "assistant", "content": offer})
             return offer
             
@@ -2,110 +2,311 @@
 Batch download functionality for ClipGenius
 """
 
+import asyncio
+import json
+import os
 import re
+import httpx
 import requests
-from typing import List, Set
-from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
-from .utils import is_valid_url, is_youtube_url
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit
+from bs4 import BeautifulSoup, SoupStrainer
+from .utils import is_valid_url, is_youtube_url, suggest_filename, ensure_directory
+
+
+# Common video URL patterns, combined so the text is scanned in a single pass.
+# Matched against raw bytes so the page never has to be decoded to text.
+_VIDEO_URL_RE = re.compile(
+    rb'https?://(?:'
+    rb'(?:www\.)?youtube\.com/watch\?v=[\w-]+'
+    rb'|youtu\.be/[\w-]+'
+    rb'|(?:www\.)?vimeo\.com/\d+'
+    rb'|(?:www\.)?dailymotion\.com/video/[\w-]+'
+    rb'|(?:www\.)?twitch\.tv/videos/\d+'
+    rb')',
+    re.IGNORECASE
+)
+
+# Bytes carried over between streamed chunks so URLs split across them are still found
+_STREAM_OVERLAP = 256
+_STREAM_CHUNK_SIZE = 65536
+
+# Only HTML is worth parsing, and no page is read past this many bytes
+_HTML_CONTENT_TYPES = frozenset({'text/html', 'application/xhtml+xml'})
+_MAX_PAGE_BYTES = 5 * 1024 * 1024
+
+# Only anchors and iframes can carry video links, so skip building the rest of the tree
+_LINK_TAGS = SoupStrainer(['a', 'iframe'])
+_LINK_ATTRS = {'a': 'href', 'iframe': 'src'}
+
+# Hosts treated as video platforms; subdomains (m., www., player.) match too
+_VIDEO_DOMAINS = frozenset({
+    'youtube.com', 'youtu.be', 'vimeo.com', 'dailymotion.com',
+    'twitch.tv', 'tiktok.com', 'instagram.com', 'facebook.com',
+    'twitter.com', 'x.com', 'rumble.com', 'bitchute.com'
+})
+
+# Query parameters ignored when deciding whether two URLs are the same video
+_TRACKING_PARAMS = frozenset({'fbclid', 'gclid', 'si', 'feature', 'ref'})
+
+# Validators and extracted URLs of pages seen in earlier runs, so an unchanged
+# page is answered with 304 and never downloaded or parsed again
+_PAGE_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.clipgenius', 'pages.json')
+_MAX_CACHED_PAGES = 500
+
+_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+def _canonicalize(url: str) -> str:
+    """Reduce a URL to the form used for duplicate detection"""
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    # Keep the query (it identifies YouTube videos) minus tracking parameters
+    query = '&'.join(
+        param for param in parts.query.split('&')
+        if param and not _is_tracking_param(param.split('=', 1)[0])
+    )
+    return urlunsplit((parts.scheme.lower(), host, parts.path, query, ''))
+
+
+def _is_tracking_param(name: str) -> bool:
+    """Check if a query parameter only tracks where a link was shared from"""
+    return name.startswith('utm_') or name in _TRACKING_PARAMS
+
+
+def _collect(urls: Iterable[str], seen: Set[str], out: List[str]) -> None:
+    """Append each URL to `out` unless its canonical form is already in `seen`"""
+    for url in urls:
+        canonical = _canonicalize(url)
+        if canonical not in seen:
+            seen.add(canonical)
+            out.append(url)
 
 
 class BatchDownloader:
     """Handles batch downloading by parsing webpages for video links"""
     
-    def __init__(self):
+    def __init__(self, max_page_bytes: int = _MAX_PAGE_BYTES, cache_path: str = _PAGE_CACHE_PATH):
+        self.max_page_bytes = max_page_bytes
+        self.cache_path = cache_path
         self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        self.session.headers.update({'User-Agent': _USER_AGENT})
+        # Per page URL: the conditional-request headers for the version last seen,
+        # and the URLs extracted from it; loaded from cache_path on first use
+        self._pages: Optional[Dict[str, dict]] = None
     
     def extract_video_urls_from_webpage(self, webpage_url: str) -> List[str]:
         """Extract video URLs from a webpage"""
         try:
-            response = self.session.get(webpage_url, timeout=10)
-            response.raise_for_status()
+            body = []
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            video_urls = set()
+            def chunks() -> Iterator[bytes]:
+                received = 0
+                for chunk in response.iter_content(chunk_size=_STREAM_CHUNK_SIZE):
+                    chunk = chunk[:self.max_page_bytes - received]
+                    received += len(chunk)
+                    body.append(chunk)
+                    yield chunk
+                    if received >= self.max_page_bytes:
+                        break
             
-            # Extract URLs from various sources
-            video_urls.update(self._extract_from_links(soup, webpage_url))
-            video_urls.update(self._extract_from_iframes(soup, webpage_url))
-            video_urls.update(self._extract_from_text(response.text))
+            # Revalidate a page seen before; an unchanged one is not sent or parsed again
+            known = self._known_pages().get(webpage_url)
+            conditional = known['headers'] if known else {}
             
-            # Filter and validate URLs
-            valid_urls = []
-            for url in video_urls:
-                if is_valid_url(url) and self._is_video_url(url):
-                    valid_urls.append(url)
+            with self.session.get(webpage_url, stream=True, timeout=10, headers=conditional) as response:
+                if response.status_code == 304 and known:
+                    return list(known['urls'])
+                
+                response.raise_for_status()
+                if not self._should_parse(webpage_url, response.headers):
+                    return []
+                
+                # Scan for URLs while the body is still arriving
+                seen: Set[str] = set()
+                video_urls: List[str] = []
+                _collect(self._extract_from_chunks(chunks()), seen, video_urls)
             
-            return list(set(valid_urls))  # Remove duplicates
+            soup = BeautifulSoup(b''.join(body), 'lxml', parse_only=_LINK_TAGS)
+            _collect(self._extract_from_tags(soup, webpage_url), seen, video_urls)
+            
+            self._remember(webpage_url, response.headers, video_urls)
+            self._save_pages()
+            return list(video_urls)
             
         except Exception as e:
             print(f"Error extracting URLs from webpage: {str(e)}")
             return []
     
-    def _extract_from_links(self, soup: BeautifulSoup, base_url: str) -> Set[str]:
-        """Extract video URLs from anchor tags"""
-        urls = set()
+    def _should_parse(self, webpage_url: str, headers) -> bool:
+        """Check response headers before reading the body of a webpage"""
+        content_type = headers.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        if content_type and content_type not in _HTML_CONTENT_TYPES:
+            print(f"Skipping {webpage_url}: not an HTML page ({content_type})")
+            return False
         
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            full_url = urljoin(base_url, href)
-            
-            if self._is_video_url(full_url):
-                urls.add(full_url)
+        content_length = headers.get('Content-Length', '')
+        if content_length.isdigit() and int(content_length) > self.max_page_bytes:
+            print(f"Skipping {webpage_url}: page is larger than {self.max_page_bytes} bytes")
+            return False
         
-        return urls
+        return True
+    
+    def _conditional_headers(self, headers) -> Dict[str, str]:
+        """Request headers that ask the server whether this version of a page changed"""
+        conditional = {}
+        if headers.get('ETag'):
+            conditional['If-None-Match'] = headers['ETag']
+        if headers.get('Last-Modified'):
+            conditional['If-Modified-Since'] = headers['Last-Modified']
+        return conditional
+    
+    def _known_pages(self) -> Dict[str, dict]:
+        """Pages remembered from earlier runs, read from cache_path once"""
+        if self._pages is None:
+            self._pages = {}
+            try:
+                with open(self.cache_path, encoding='utf-8') as f:
+                    pages = json.load(f)
+                if isinstance(pages, dict):
+                    self._pages = pages
+            except (OSError, ValueError):
+                pass
+        return self._pages
+    
+    def _remember(self, webpage_url: str, headers, video_urls: List[str]) -> None:
+        """Store a page's validators and URLs so the next run can revalidate it"""
+        validators = self._conditional_headers(headers)
+        pages = self._known_pages()
+        # Re-insert so the dict stays ordered from least to most recently seen
+        pages.pop(webpage_url, None)
+        if validators:
+            pages[webpage_url] = {'headers': validators, 'urls': list(video_urls)}
     
-    def _extract_from_iframes(self, soup: BeautifulSoup, base_url: str) -> Set[str]:
-        """Extract video URLs from iframe elements"""
-        urls = set()
+    def _save_pages(self) -> None:
+        """Write the remembered pages back to cache_path, keeping the most recent ones"""
+        if self._pages is None:
+            return
+        pages = dict(list(self._pages.items())[-_MAX_CACHED_PAGES:])
+        try:
+            ensure_directory(os.path.dirname(self.cache_path))
+            temp_path = self.cache_path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(pages, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            # The cache only saves bandwidth; failing to write it is not an error
+            pass
+    
+    def extract_many(self, webpage_urls: List[str], concurrency: int = 16) -> List[str]:
+        """Extract video URLs from several webpages, fetching them concurrently"""
+        return asyncio.run(self.extract_many_async(webpage_urls, concurrency))
+    
+    async def extract_many_async(self, webpage_urls: List[str], concurrency: int = 16) -> List[str]:
+        """Async variant of extract_many"""
+        semaphore = asyncio.Semaphore(concurrency)
+        loop = asyncio.get_running_loop()
+        pages = self._known_pages()
         
-        for iframe in soup.find_all('iframe', src=True):
-            src = iframe['src']
-            full_url = urljoin(base_url, src)
+        async with httpx.AsyncClient(headers={'User-Agent': _USER_AGENT}, timeout=10,
+                                     follow_redirects=True) as client:
+            async def fetch_and_extract(webpage_url: str) -> List[str]:
+                known = pages.get(webpage_url)
+                async with semaphore:
+                    try:
+                        conditional = known['headers'] if known else {}
+                        async with client.stream('GET', webpage_url, headers=conditional) as response:
+                            if response.status_code == 304 and known:
+                                return list(known['urls'])
+                            
+                            response.raise_for_status()
+                            if not self._should_parse(webpage_url, response.headers):
+                                return []
+                            
+                            body = bytearray()
+                            async for chunk in response.aiter_bytes(_STREAM_CHUNK_SIZE):
+                                body += chunk
+                                if len(body) >= self.max_page_bytes:
+                                    break
+                            content = bytes(body[:self.max_page_bytes])
+                    except Exception as e:
+                        print(f"Error extracting URLs from webpage: {str(e)}")
+                        return []
+                # Parsing is CPU-bound; run it off the loop so other fetches keep going
+                page_urls = await loop.run_in_executor(
+                    None, self._extract_from_page, content, webpage_url
+                )
+                self._remember(webpage_url, response.headers, page_urls)
+                return page_urls
             
-            if self._is_video_url(full_url):
-                urls.add(full_url)
+            results = await asyncio.gather(*(fetch_and_extract(url) for url in webpage_urls))
         
-        return urls
+        self._save_pages()
+        
+        # Merge while keeping first-seen order across pages
+        seen: Set[str] = set()
+        video_urls: List[str] = []
+        for page_urls in results:
+            _collect(page_urls, seen, video_urls)
+        return video_urls
     
-    def _extract_from_text(self, text: str) -> Set[str]:
-        """Extract video URLs from plain text using regex"""
-        urls = set()
+    def _extract_from_page(self, content: bytes, base_url: str) -> List[str]:
+        """Extract video URLs from a downloaded page body"""
+        soup = BeautifulSoup(content, 'lxml', parse_only=_LINK_TAGS)
         
-        # Common video URL patterns
-        patterns = [
-            r'https?://(?:www\.)?youtube\.com/watch\?v=[\w-]+',
-            r'https?://youtu\.be/[\w-]+',
-            r'https?://(?:www\.)?vimeo\.com/\d+',
-            r'https?://(?:www\.)?dailymotion\.com/video/[\w-]+',
-            r'https?://(?:www\.)?twitch\.tv/videos/\d+',
-        ]
+        # Both extractors only yield video URLs, so no second filtering pass is needed
+        seen: Set[str] = set()
+        video_urls: List[str] = []
+        _collect(self._extract_from_tags(soup, base_url), seen, video_urls)
+        _collect(self._extract_from_chunks([content]), seen, video_urls)
         
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            urls.update(matches)
+        return video_urls
+    
+    def _extract_from_tags(self, soup: BeautifulSoup, base_url: str) -> Iterator[str]:
+        """Extract video URLs from anchor and iframe elements in one pass"""
+        for tag in soup.find_all(True):
+            target = tag.get(_LINK_ATTRS.get(tag.name, ''))
+            if not target:
+                continue
+            
+            full_url = urljoin(base_url, target)
+            if self._is_video_url(full_url):
+                yield full_url
+    
+    def _extract_from_chunks(self, chunks: Iterable[bytes]) -> Iterator[str]:
+        """Extract video URLs from a page body delivered in chunks using regex"""
+        pending = b''
         
-        return urls
+        for chunk in chunks:
+            window = pending + chunk
+            # A match reaching into the overlap may continue in the next chunk,
+            # so it is left for the next window to pick up in full
+            cut = len(window) - _STREAM_OVERLAP
+            for match in _VIDEO_URL_RE.finditer(window):
+                if match.end() >= cut:
+                    cut = min(cut, match.start())
+                    break
+                yield match.group().decode('ascii')
+            pending = window[max(cut, 0):]
+        
+        for match in _VIDEO_URL_RE.finditer(pending):
+            yield match.group().decode('ascii')
     
     def _is_video_url(self, url: str) -> bool:
         """Check if URL is likely a video URL"""
-        if not is_valid_url(url):
+        try:
+            host = urlparse(url).hostname
+        except ValueError:
             return False
         
-        video_platforms = [
-            'youtube.com', 'youtu.be', 'vimeo.com', 'dailymotion.com',
-            'twitch.tv', 'tiktok.com', 'instagram.com', 'facebook.com',
-            'twitter.com', 'x.com', 'rumble.com', 'bitchute.com'
-        ]
-        
-        try:
-            domain = urlparse(url).netloc.lower()
-            return any(platform in domain for platform in video_platforms)
-        except Exception:
+        if not host:
             return False
+        
+        # Look up the host and each parent domain: m.youtube.com -> youtube.com
+        labels = host.split('.')
+        return any('.'.join(labels[i:]) in _VIDEO_DOMAINS for i in range(len(labels) - 1))
     
     def parse_url_list(self, url_list_text: str) -> List[str]:
         """Parse a text containing multiple URLs (one per line or comma-separated)"""
@@ -123,35 +324,4 @@ class BatchDownloader:
     
     def suggest_filename(self, video_info: dict) -> str:
         """Suggest a custom filename based on video content"""
-        title = video_info.get('title', 'unknown')
-        uploader = video_info.get('uploader', 'unknown')
-        duration = video_info.get('duration', 0)
-        
-        # Create a descriptive filename
-        filename_parts = []
-        
-        if uploader and uploader.lower() != 'unknown':
-            filename_parts.append(uploader[:20])  # Limit uploader name length
-        
-        if title and title.lower() != 'unknown':
-            # Clean and truncate title
-            clean_title = re.sub(r'[^\w\s-]', '', title)
-            clean_title = ' '.join(clean_title.split())  # Remove extra whitespace
-            filename_parts.append(clean_title[:50])  # Limit title length
-        
-        if duration and duration > 0:
-            minutes = duration // 60
-            if minutes > 60:
-                hours = minutes // 60
-                minutes = minutes % 60
-                filename_parts.append(f"{hours}h{minutes}m")
-            else:
-                filename_parts.append(f"{minutes}m")
-        
-        suggested_name = " - ".join(filename_parts)
-        
-        # Fallback if nothing useful was found
-        if not suggested_name or suggested_name.strip() == "":
-            suggested_name = "video_download"
-        
-        return suggested_name
\ No newline at end of file
+        return suggest_filename(video_info)
\ No newline at end of file
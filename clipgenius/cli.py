@@ -5,59 +5,228 @@ Command-line interface for ClipGenius
 import os
 import sys
 import click
-from colorama import init, Fore, Style
-from typing import Optional, List
-from .ai_agent import AIAgent
-from .downloader import VideoDownloader
-from .batch import BatchDownloader
-from .utils import is_valid_url, is_youtube_url
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, List, Tuple, TYPE_CHECKING
+from .utils import is_valid_url, is_youtube_url, format_file_size, suggest_filename
 
+if TYPE_CHECKING:
+    from .ai_agent import AIAgent
+    from .downloader import VideoDownloader
+    from .batch import BatchDownloader
 
-# Initialize colorama for cross-platform colored output
-init(autoreset=True)
+
+# Colours are written as raw ANSI escapes, and only when stdout is a terminal so
+# piped output stays clean. Windows consoles need colorama to translate them,
+# which is set up on the first coloured write rather than at import time.
+_USE_COLOR = sys.stdout is not None and sys.stdout.isatty()
+_colorama_pending = _USE_COLOR and os.name == 'nt'
+
+
+def _start_color() -> None:
+    """Initialise colorama once, on Windows terminals only"""
+    global _colorama_pending
+    if _colorama_pending:
+        _colorama_pending = False
+        from colorama import init
+        init()
+
+
+def _ansi(code: int) -> str:
+    """ANSI escape for an SGR code, or nothing when colour is disabled"""
+    return f'\x1b[{code}m' if _USE_COLOR else ''
+
+
+_RED = _ansi(31)
+_GREEN = _ansi(32)
+_YELLOW = _ansi(33)
+_BLUE = _ansi(34)
+_MAGENTA = _ansi(35)
+_CYAN = _ansi(36)
+_RESET = _ansi(0)
+
+# Message prefixes and line ending, composed once for the print_* helpers
+_PREFIX_SUCCESS = _GREEN + "✅ "
+_PREFIX_ERROR = _RED + "❌ "
+_PREFIX_INFO = _BLUE + "ℹ️  "
+_PREFIX_WARNING = _YELLOW + "⚠️  "
+_SUFFIX = _RESET + "\n"
+_PROMPT_PREFIX = _CYAN + "❓ "
+_PROMPT_SUFFIX = _RESET + " "
+
+
+# Column layout of the format table, bound once instead of re-parsed per row
+_ROW = "{:<8} {:<15} {:<8} {:<12} {}".format
+
+# Accepted answers for yes/no and video/audio prompts
+_YES = frozenset({'y', 'yes', 'yeah', 'yep', 'true', '1'})
+_AUDIO = frozenset({'a', 'audio', 'sound', 'music'})
+
+# Further words understood by the one-line download preferences form
+_SUBTITLES = frozenset({'sub', 'subs', 'subtitles', 'captions'})
+_THUMBNAIL = frozenset({'thumb', 'thumbs', 'thumbnail'})
+_QUALITIES = frozenset({'best', 'worst'})
+
+# Banner and section rules, built once rather than on every print
+_BANNER = f"""
+{_CYAN}
+╔═══════════════════════════════════════╗
+║            🎬 ClipGenius 🤖            ║
+║    AI-Powered Video Download Tool     ║
+╚═══════════════════════════════════════╝
+{_RESET}
+
+"""
+_SEP50 = "=" * 50
+_SEP70 = "=" * 70
+_DASH60 = "-" * 60
+_DASH70 = "-" * 70
+
+# Section headers with their rules, so each section opens with a ready-made string
+_HEADER_ANALYSIS = f"\n{_MAGENTA}🎬 Video Analysis{_RESET}\n{_SEP50}"
+_HEADER_PREFERENCES = f"\n{_YELLOW}📋 Download Preferences{_RESET}\n{_SEP50}"
+_HEADER_FORMATS = (f"\n{_CYAN}📺 Available Formats{_RESET}\n{_SEP70}\n"
+                   f"{_ROW('ID', 'Resolution', 'Extension', 'Size', 'Note')}\n{_DASH70}")
+_HEADER_DOWNLOAD = f"\n{_GREEN}🚀 Starting Download{_RESET}\n{_SEP50}"
+_HEADER_OFFER = f"\n{_MAGENTA}🎁 Additional Options{_RESET}"
+_HEADER_TROUBLESHOOTING = f"\n{_YELLOW}💡 Troubleshooting Help{_RESET}"
+_HEADER_SUMMARY = f"\n{_CYAN}📋 Download Summary{_RESET}\n{_SEP50}"
+_HEADER_BATCH = f"{_CYAN}🔄 Batch Download Mode{_RESET}\n{_SEP50}"
+_HEADER_BATCH_PREFERENCES = f"{_YELLOW}📋 Batch Download Preferences{_RESET}\n{_SEP50}"
+_HEADER_BATCH_DONE = f"\n{_GREEN}🎉 Batch Download Complete!{_RESET}\n{_SEP50}"
+
+# Cached in place of metadata for a URL whose extraction already failed
+_NO_INFO: dict = {}
+
+
+def _prefetch_info(downloader: 'VideoDownloader', url: str) -> Tuple[Optional[dict], Optional[str]]:
+    """Look up a video's metadata in a worker thread, returning the error instead of printing it"""
+    try:
+        # Only titles and durations are shown in batch mode, so skip yt-dlp's format processing
+        return downloader.extract_video_info(url, process=False), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _read_url_list(lines: Iterable[str]) -> List[str]:
+    """Collect valid URLs from lines of a URL list, skipping blanks and # comments"""
+    urls = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        for part in line.split(','):
+            part = part.strip()
+            if part and is_valid_url(part):
+                urls.append(part)
+    return urls
+
+
+def _parse_preferences(answer: str) -> dict:
+    """Read format, quality, subtitle and thumbnail choices from one line like '720p subs'"""
+    preferences = {'audio_only': False, 'quality': 'best', 'subtitles': False, 'thumbnail': False}
+    for word in answer.lower().replace(',', ' ').split():
+        if word in _AUDIO:
+            preferences['audio_only'] = True
+        elif word in _SUBTITLES:
+            preferences['subtitles'] = True
+        elif word in _THUMBNAIL:
+            preferences['thumbnail'] = True
+        elif word in _QUALITIES or (word[:-1].isdigit() and word.endswith('p')):
+            preferences['quality'] = word
+    if preferences['audio_only']:
+        del preferences['quality']
+    return preferences
+
+
+def _emit(lines: List[str]) -> None:
+    """Write a block of lines to stdout with a single write call"""
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 class CLIInterface:
     """Main CLI interface for ClipGenius"""
     
-    def __init__(self):
-        self.ai_agent = AIAgent()
-        self.downloader = VideoDownloader()
-        self.batch_downloader = BatchDownloader()
+    __slots__ = (
+        'download_path', '_ai_enabled',
+        '_ai_agent', '_downloader', '_batch_downloader',
+        'current_url', 'current_video_info',
+        '_info_cache', '_formats_cache',
+    )
+    
+    def __init__(self, download_path: str = './downloads', ai_enabled: bool = True):
+        self.download_path = download_path
+        # With AI disabled the agent is never touched, so openai is never imported
+        self._ai_enabled = ai_enabled
+        # Services are created on first use, so paths that never need them
+        # (e.g. --no-ai or batch mode) don't pay for importing their dependencies
+        self._ai_agent: Optional['AIAgent'] = None
+        self._downloader: Optional['VideoDownloader'] = None
+        self._batch_downloader: Optional['BatchDownloader'] = None
         self.current_url: Optional[str] = None
         self.current_video_info: Optional[dict] = None
+        # Per-session metadata keyed by URL, so a URL is only extracted once
+        self._info_cache: Dict[str, dict] = {}
+        self._formats_cache: Dict[str, List[dict]] = {}
+    
+    @property
+    def ai_agent(self) -> 'AIAgent':
+        """AI agent, created on first access"""
+        if self._ai_agent is None:
+            from .ai_agent import AIAgent
+            self._ai_agent = AIAgent()
+        return self._ai_agent
+    
+    @property
+    def downloader(self) -> 'VideoDownloader':
+        """Video downloader, created on first access"""
+        if self._downloader is None:
+            from .downloader import VideoDownloader
+            self._downloader = VideoDownloader(self.download_path)
+        return self._downloader
+    
+    @property
+    def batch_downloader(self) -> 'BatchDownloader':
+        """Batch downloader, created on first access"""
+        if self._batch_downloader is None:
+            from .batch import BatchDownloader
+            self._batch_downloader = BatchDownloader()
+        return self._batch_downloader
     
     def print_banner(self):
         """Print the ClipGenius banner"""
-        banner = f"""
-{Fore.CYAN}
-╔═══════════════════════════════════════╗
-║            🎬 ClipGenius 🤖            ║
-║    AI-Powered Video Download Tool     ║
-╚═══════════════════════════════════════╝
-{Style.RESET_ALL}
-"""
-        print(banner)
+        _start_color()
+        sys.stdout.write(_BANNER)
     
     def print_success(self, message: str):
         """Print success message in green"""
-        print(f"{Fore.GREEN}✅ {message}{Style.RESET_ALL}")
+        _start_color()
+        sys.stdout.write(_PREFIX_SUCCESS + message + _SUFFIX)
     
     def print_error(self, message: str):
         """Print error message in red"""
-        print(f"{Fore.RED}❌ {message}{Style.RESET_ALL}")
+        _start_color()
+        sys.stdout.write(_PREFIX_ERROR + message + _SUFFIX)
     
     def print_info(self, message: str):
         """Print info message in blue"""
-        print(f"{Fore.BLUE}ℹ️  {message}{Style.RESET_ALL}")
+        _start_color()
+        sys.stdout.write(_PREFIX_INFO + message + _SUFFIX)
     
     def print_warning(self, message: str):
         """Print warning message in yellow"""
-        print(f"{Fore.YELLOW}⚠️  {message}{Style.RESET_ALL}")
+        _start_color()
+        sys.stdout.write(_PREFIX_WARNING + message + _SUFFIX)
     
     def get_user_input(self, prompt: str) -> str:
         """Get user input with colored prompt"""
-        return input(f"{Fore.CYAN}❓ {prompt}{Style.RESET_ALL} ").strip()
+        return input(_PROMPT_PREFIX + prompt + _PROMPT_SUFFIX).strip()
+    
+    def _yn(self, prompt: str, default: bool = False) -> bool:
+        """Ask a yes/no question; a blank answer gives `default`"""
+        answer = self.get_user_input(prompt)
+        if not answer:
+            return default
+        return answer.lower() in _YES
     
     def validate_url(self, url: str) -> bool:
         """Validate and set the current URL"""
@@ -73,10 +242,13 @@ class CLIInterface:
         if not self.current_url:
             return False
         
-        self.print_info("Analyzing video... 🔍")
-        
-        # Get video information
-        self.current_video_info = self.downloader.get_video_info(self.current_url)
+        # Get video information, reusing what this session already fetched
+        self.current_video_info = self._info_cache.get(self.current_url)
+        if self.current_video_info is None:
+            self.print_info("Analyzing video... 🔍")
+            self.current_video_info = self.downloader.get_video_info(self.current_url)
+            if self.current_video_info:
+                self._info_cache[self.current_url] = self.current_video_info
         
         if not self.current_video_info:
             self.print_error("Could not extract video information. Please check the URL and try again.")
@@ -84,55 +256,36 @@ class CLIInterface:
         
         return True
     
-    def show_video_summary(self):
+    def show_video_summary(self, summary: Optional[str] = None):
         """Display video summary using AI agent"""
         if not self.current_video_info:
             return
         
-        print(f"\n{Fore.MAGENTA}🎬 Video Analysis{Style.RESET_ALL}")
-        print("=" * 50)
+        _emit([_HEADER_ANALYSIS])
         
-        # Get AI summary
-        summary = self.ai_agent.summarize_video_metadata(self.current_video_info)
-        print(summary)
-        print()
+        # Get AI summary unless it was already generated
+        if summary is None:
+            summary = self.ai_agent.summarize_video_metadata(self.current_video_info)
+        sys.stdout.write(summary + "\n\n")
     
     def get_download_preferences(self) -> dict:
         """Get user's download preferences"""
-        print(f"\n{Fore.YELLOW}📋 Download Preferences{Style.RESET_ALL}")
-        print("=" * 50)
+        _emit([_HEADER_PREFERENCES])
         
         # Ask AI agent for preferences
         preferences_prompt = self.ai_agent.ask_about_preferences()
-        print(preferences_prompt)
-        print()
+        sys.stdout.write(preferences_prompt + "\n\n")
         
-        preferences = {}
-        
-        # Get format preference
-        format_choice = self.get_user_input("Video or audio only? (video/audio)").lower()
-        preferences['audio_only'] = format_choice.startswith('audio') or format_choice.startswith('a')
-        
-        # Get quality preference if not audio only
-        if not preferences['audio_only']:
-            quality = self.get_user_input("Quality preference? (best/720p/480p/360p/worst)")
-            preferences['quality'] = quality if quality else 'best'
-        
-        # Get subtitles preference
-        subtitles = self.get_user_input("Download subtitles? (yes/no)").lower()
-        preferences['subtitles'] = subtitles.startswith('y')
-        
-        # Get thumbnail preference
-        thumbnail = self.get_user_input("Download thumbnail? (yes/no)").lower()
-        preferences['thumbnail'] = thumbnail.startswith('y')
+        # Format, quality, subtitles and thumbnail are answered on a single line
+        preferences = _parse_preferences(self.get_user_input(
+            "Format and extras? e.g. '720p subs thumb' or 'audio' (blank: video, best quality)"))
         
         # Get custom filename
         custom_name = self.get_user_input("Custom filename? (leave blank for default)")
         if not custom_name and self.current_video_info:
             # Suggest filename based on video content
-            suggested = self.batch_downloader.suggest_filename(self.current_video_info)
-            use_suggested = self.get_user_input(f"Use suggested filename '{suggested}'? (yes/no)").lower()
-            if use_suggested.startswith('y'):
+            suggested = suggest_filename(self.current_video_info)
+            if self._yn(f"Use suggested filename '{suggested}'? (yes/no)"):
                 custom_name = suggested
         
         preferences['custom_filename'] = custom_name if custom_name else None
@@ -144,87 +297,90 @@ class CLIInterface:
         if not self.current_url:
             return
         
-        formats = self.downloader.get_available_formats(self.current_url)
+        formats = self._formats_cache.get(self.current_url)
+        if formats is None:
+            formats = self.downloader.get_top_formats(self.current_url, 10, info=self.current_video_info)
+            self._formats_cache[self.current_url] = formats
         if not formats:
             self.print_warning("No formats available or could not fetch format information.")
             return
         
-        print(f"\n{Fore.CYAN}📺 Available Formats{Style.RESET_ALL}")
-        print("=" * 70)
-        print(f"{'ID':<8} {'Resolution':<15} {'Extension':<8} {'Size':<12} {'Note'}")
-        print("-" * 70)
+        buf = [_HEADER_FORMATS]
         
-        for fmt in formats[:10]:  # Show top 10 formats
+        for fmt in formats:  # Top 10 formats only
             format_id = fmt.get('format_id', 'N/A')
             resolution = fmt.get('resolution', 'N/A')
             ext = fmt.get('ext', 'N/A')
             filesize = self._format_size(fmt.get('filesize'))
             note = fmt.get('format_note', '')[:20]
             
-            print(f"{format_id:<8} {resolution:<15} {ext:<8} {filesize:<12} {note}")
+            buf.append(_ROW(format_id, resolution, ext, filesize, note))
         
-        if len(formats) > 10:
-            self.print_info(f"... and {len(formats) - 10} more formats available")
-        print()
+        total = len((self.current_video_info or {}).get('formats') or ())
+        if total > 10:
+            buf.append(f"{_PREFIX_INFO}... and {total - 10} more formats available{_RESET}")
+        buf.append("")
+        _emit(buf)
     
     def _format_size(self, size_bytes):
         """Format file size for display"""
-        if size_bytes is None:
-            return "Unknown"
-        
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f}{unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f}TB"
+        return format_file_size(size_bytes, sep='')
     
     def perform_download(self, preferences: dict):
         """Perform the actual download"""
         if not self.current_url:
             return
         
-        print(f"\n{Fore.GREEN}🚀 Starting Download{Style.RESET_ALL}")
-        print("=" * 50)
+        _emit([_HEADER_DOWNLOAD])
         
-        # Perform main download
-        result = self.downloader.download_video(
+        # Video, subtitles and thumbnail are fetched by one yt-dlp run
+        want_subs = bool(preferences.get('subtitles'))
+        want_thumb = bool(preferences.get('thumbnail'))
+        result = self.downloader.download_bundle(
             url=self.current_url,
             audio_only=preferences.get('audio_only', False),
-            custom_filename=preferences.get('custom_filename')
+            custom_filename=preferences.get('custom_filename'),
+            subtitles=want_subs,
+            thumbnail=want_thumb
         )
         
         if result['success']:
             self.print_success(result['message'])
-            
-            # Download additional resources if requested
-            if preferences.get('subtitles'):
-                self.print_info("Downloading subtitles...")
-                sub_result = self.downloader.download_subtitles(self.current_url)
-                if sub_result['success']:
-                    self.print_success("Subtitles downloaded!")
-                else:
-                    self.print_warning(f"Subtitles download failed: {sub_result['message']}")
-            
-            if preferences.get('thumbnail'):
-                self.print_info("Downloading thumbnail...")
-                thumb_result = self.downloader.download_thumbnail(self.current_url)
-                if thumb_result['success']:
-                    self.print_success("Thumbnail downloaded!")
-                else:
-                    self.print_warning(f"Thumbnail download failed: {thumb_result['message']}")
+            if result['subtitles_error']:
+                self.print_warning(f"Subtitles download failed: {result['subtitles_error']}")
+            elif want_subs:
+                self.print_success("Subtitles downloaded!")
+            if want_thumb:
+                self.print_success("Thumbnail downloaded!")
             
             # Offer related resources
-            print(f"\n{Fore.MAGENTA}🎁 Additional Options{Style.RESET_ALL}")
-            offer = self.ai_agent.offer_related_resources(self.current_video_info or {})
-            print(offer)
+            if self._ai_enabled:
+                offer = self.ai_agent.offer_related_resources(self.current_video_info or {})
+                _emit([_HEADER_OFFER, offer])
             
         else:
             self.print_error(result['message'])
             
             # Get AI suggestions for the error
-            print(f"\n{Fore.YELLOW}💡 Troubleshooting Help{Style.RESET_ALL}")
-            suggestion = self.ai_agent.suggest_error_solution(result['error'], self.current_url)
-            print(suggestion)
+            if self._ai_enabled:
+                suggestion = self.ai_agent.suggest_error_solution(result['error'], self.current_url)
+                _emit([_HEADER_TROUBLESHOOTING, suggestion])
+    
+    def _print_download_summary(self, preferences: dict):
+        """Print the confirmed download settings"""
+        summary = [
+            _HEADER_SUMMARY,
+            f"URL: {self.current_url}",
+            f"Type: {'Audio only' if preferences['audio_only'] else 'Video + Audio'}",
+        ]
+        if not preferences['audio_only']:
+            summary.append(f"Quality: {preferences.get('quality', 'best')}")
+        summary.append(f"Subtitles: {'Yes' if preferences['subtitles'] else 'No'}")
+        summary.append(f"Thumbnail: {'Yes' if preferences['thumbnail'] else 'No'}")
+        if preferences['custom_filename']:
+            summary.append(f"Custom filename: {preferences['custom_filename']}")
+        summary.append("")
+        _emit(summary)
     
     def run_interactive_mode(self, url: str):
         """Run the interactive download process"""
@@ -234,153 +390,176 @@ class CLIInterface:
         if not self.validate_url(url):
             return False
         
-        # Greet user and analyze URL
-        greeting = self.ai_agent.greet_user(url)
-        print(greeting)
-        print()
-        
         # Analyze video
         if not self.analyze_video():
             return False
         
+        # Greeting and summary are independent requests, so issue them together
+        greeting, summary = self.ai_agent.introduce(url, self.current_video_info)
+        sys.stdout.write(greeting + "\n\n")
+        
         # Show video summary
-        self.show_video_summary()
+        self.show_video_summary(summary)
         
         # Ask if user wants to see available formats
-        show_formats = self.get_user_input("Would you like to see available formats? (yes/no)").lower()
-        if show_formats.startswith('y'):
+        if self._yn("Would you like to see available formats? (yes/no)"):
             self.show_available_formats()
         
         # Get download preferences
         preferences = self.get_download_preferences()
         
-        # Confirm download
-        print(f"\n{Fore.CYAN}📋 Download Summary{Style.RESET_ALL}")
-        print("=" * 50)
-        print(f"URL: {self.current_url}")
-        print(f"Type: {'Audio only' if preferences['audio_only'] else 'Video + Audio'}")
-        if not preferences['audio_only']:
-            print(f"Quality: {preferences.get('quality', 'best')}")
-        print(f"Subtitles: {'Yes' if preferences['subtitles'] else 'No'}")
-        print(f"Thumbnail: {'Yes' if preferences['thumbnail'] else 'No'}")
-        if preferences['custom_filename']:
-            print(f"Custom filename: {preferences['custom_filename']}")
-        print()
-        
-        confirm = self.get_user_input("Proceed with download? (yes/no)").lower()
-        if not confirm.startswith('y'):
+        # Confirm with a compact one-line prompt; the full summary is only built once confirmed
+        kind = 'audio only' if preferences['audio_only'] else preferences.get('quality', 'best')
+        if not self._yn(f"Download {self.current_url} ({kind})? (yes/no)"):
             self.print_info("Download cancelled.")
             return False
         
+        self._print_download_summary(preferences)
+        
         # Perform download
         self.perform_download(preferences)
         return True
     
-    def run_batch_mode(self, input_source: str, is_webpage: bool = False):
-        """Run batch download mode"""
+    def run_batch_mode(self, input_source: Optional[str] = None, is_webpage: bool = False,
+                       urls: Optional[List[str]] = None, batch_prefs: Optional[dict] = None):
+        """Run batch download mode on `input_source`, or on already parsed `urls`
+        
+        With `batch_prefs` given, nothing is prompted for (e.g. when stdin carried the URLs).
+        """
         self.print_banner()
         
-        print(f"{Fore.CYAN}🔄 Batch Download Mode{Style.RESET_ALL}")
-        print("=" * 50)
+        _emit([_HEADER_BATCH])
         
-        # Extract URLs
-        urls = []
-        if is_webpage:
-            self.print_info(f"Extracting video URLs from webpage: {input_source}")
-            urls = self.batch_downloader.extract_video_urls_from_webpage(input_source)
-        else:
-            # Treat as list of URLs
-            urls = self.batch_downloader.parse_url_list(input_source)
+        # Extract URLs, unless the caller already parsed them
+        if urls is None:
+            if is_webpage:
+                self.print_info(f"Extracting video URLs from webpage: {input_source}")
+                pages = self.batch_downloader.parse_url_list(input_source)
+                if len(pages) > 1:
+                    # Several pages: fetch them concurrently
+                    urls = self.batch_downloader.extract_many(pages)
+                else:
+                    urls = self.batch_downloader.extract_video_urls_from_webpage(input_source)
+            else:
+                # Treat as list of URLs
+                urls = self.batch_downloader.parse_url_list(input_source)
         
         if not urls:
             self.print_error("No valid video URLs found!")
             return False
         
+        # Repeated entries would otherwise be fetched and downloaded again
+        urls = list(dict.fromkeys(urls))
+        
         self.print_success(f"Found {len(urls)} video URLs:")
-        for i, url in enumerate(urls, 1):
-            print(f"  {i}. {url}")
-        print()
-        
-        # Ask for batch preferences
-        print(f"{Fore.YELLOW}📋 Batch Download Preferences{Style.RESET_ALL}")
-        print("=" * 50)
-        
-        batch_prefs = {}
-        batch_prefs['audio_only'] = self.get_user_input("Download all as audio only? (yes/no)").lower().startswith('y')
-        if not batch_prefs['audio_only']:
-            batch_prefs['quality'] = self.get_user_input("Quality for all videos? (best/720p/480p/etc.)") or 'best'
-        batch_prefs['subtitles'] = self.get_user_input("Download subtitles for all? (yes/no)").lower().startswith('y')
-        batch_prefs['thumbnails'] = self.get_user_input("Download thumbnails for all? (yes/no)").lower().startswith('y')
-        
-        confirm = self.get_user_input(f"Proceed with batch download of {len(urls)} videos? (yes/no)").lower()
-        if not confirm.startswith('y'):
-            self.print_info("Batch download cancelled.")
-            return False
+        _emit([f"  {i}. {url}" for i, url in enumerate(urls, 1)] + [""])
+        
+        if batch_prefs is None:
+            # Ask for batch preferences
+            _emit([_HEADER_BATCH_PREFERENCES])
+            
+            # Answered on a single line, the same way as for a single video
+            batch_prefs = _parse_preferences(self.get_user_input(
+                "Format and extras for all videos? e.g. '720p subs thumb' or 'audio' (blank: video, best quality)"))
+            
+            if not self._yn(f"Proceed with batch download of {len(urls)} videos? (yes/no)"):
+                self.print_info("Batch download cancelled.")
+                return False
+        
+        # Metadata lookups are independent network round-trips, so submit them all
+        # at once; each video's download starts as soon as its own lookup is done
+        downloader = self.downloader
+        pending = [url for url in urls if url not in self._info_cache and is_valid_url(url)]
+        if pending:
+            self.print_info(f"Analyzing {len(pending)} videos... 🔍")
+        
+        # Batch preferences are the same for every video
+        audio_only = batch_prefs['audio_only']
+        want_subs = batch_prefs['subtitles']
+        want_thumb = batch_prefs['thumbnail']
         
         # Process each URL
         successful = 0
         failed = 0
-        
-        for i, url in enumerate(urls, 1):
-            print(f"\n{Fore.CYAN}📹 Processing {i}/{len(urls)}: {url}{Style.RESET_ALL}")
-            print("-" * 60)
-            
-            # Set current URL and analyze
-            if not self.validate_url(url):
-                failed += 1
-                continue
-            
-            if not self.analyze_video():
-                failed += 1
-                continue
-            
-            # Show brief video info
-            if self.current_video_info:
-                title = self.current_video_info.get('title', 'Unknown')[:50]
-                duration = self.current_video_info.get('duration', 0)
-                duration_str = f"{duration//60}m {duration%60}s" if duration else "Unknown"
-                print(f"   Title: {title}")
-                print(f"   Duration: {duration_str}")
-            
-            # Use batch preferences
-            preferences = batch_prefs.copy()
-            
-            # Suggest filename for this video
-            if self.current_video_info:
-                suggested = self.batch_downloader.suggest_filename(self.current_video_info)
-                preferences['custom_filename'] = suggested
-            
-            # Download
-            result = self.downloader.download_video(
-                url=self.current_url,
-                audio_only=preferences.get('audio_only', False),
-                custom_filename=preferences.get('custom_filename')
-            )
-            
-            if result['success']:
-                self.print_success(f"Downloaded: {title[:30]}...")
-                successful += 1
-                
-                # Download additional resources if requested
-                if preferences.get('subtitles'):
-                    sub_result = self.downloader.download_subtitles(self.current_url)
-                    if not sub_result['success']:
-                        self.print_warning("Subtitles failed")
-                
-                if preferences.get('thumbnails'):
-                    thumb_result = self.downloader.download_thumbnail(self.current_url)
-                    if not thumb_result['success']:
-                        self.print_warning("Thumbnail failed")
-            else:
-                self.print_error(f"Failed: {result.get('error', 'Unknown error')}")
-                failed += 1
+        # Subtitle/thumbnail downloads run in the background, overlapping the
+        # next video's main download; results are reported at the end
+        side_jobs = []
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(pending)))) as info_executor, \
+                ThreadPoolExecutor(max_workers=2) as side_executor:
+            info_jobs = {url: info_executor.submit(_prefetch_info, downloader, url)
+                         for url in pending}
+            try:
+                for i, url in enumerate(urls, 1):
+                    _emit([f"\n{_CYAN}📹 Processing {i}/{len(urls)}: {url}{_RESET}", _DASH60])
+                    
+                    # Set current URL and analyze (served from the prefetched metadata)
+                    if not self.validate_url(url):
+                        failed += 1
+                        continue
+                    
+                    job = info_jobs.pop(url, None)
+                    if job is not None:
+                        # Errors are reported here, under the video they belong to
+                        info, error = job.result()
+                        if error:
+                            print(f"Error extracting video info: {error}")
+                        # A failed lookup is recorded too, so it is reported rather than retried
+                        self._info_cache[url] = info or _NO_INFO
+                    
+                    if not self.analyze_video():
+                        failed += 1
+                        continue
+                    
+                    # Show brief video info
+                    info = self.current_video_info
+                    title = info.get('title', 'Unknown')[:50]
+                    duration = info.get('duration', 0)
+                    duration_str = f"{duration//60}m {duration%60}s" if duration else "Unknown"
+                    _emit([f"   Title: {title}", f"   Duration: {duration_str}"])
+                    
+                    # Download under a filename suggested from the video's metadata
+                    result = downloader.download_video(
+                        url=self.current_url,
+                        audio_only=audio_only,
+                        custom_filename=suggest_filename(info)
+                    )
+                    
+                    if result['success']:
+                        self.print_success(f"Downloaded: {title[:30]}...")
+                        successful += 1
+                        
+                        # Download additional resources if requested
+                        if want_subs:
+                            side_jobs.append(("Subtitles", title, side_executor.submit(
+                                downloader.download_subtitles, self.current_url, info=info)))
+                        
+                        if want_thumb:
+                            side_jobs.append(("Thumbnail", title, side_executor.submit(
+                                downloader.download_thumbnail, self.current_url, info=info)))
+                    else:
+                        self.print_error(f"Failed: {result.get('error', 'Unknown error')}")
+                        failed += 1
+            except BaseException:
+                # Interrupted: subtitle/thumbnail jobs still queued are not wanted either
+                for _, _, future in side_jobs:
+                    future.cancel()
+                raise
+            finally:
+                # Lookups nobody will read would otherwise hold up the executor's shutdown
+                for job in info_jobs.values():
+                    job.cancel()
+        
+        for label, title, future in side_jobs:
+            if not future.result()['success']:
+                self.print_warning(f"{label} failed: {title[:30]}")
         
         # Summary
-        print(f"\n{Fore.GREEN}🎉 Batch Download Complete!{Style.RESET_ALL}")
-        print("=" * 50)
-        print(f"✅ Successful: {successful}")
-        print(f"❌ Failed: {failed}")
-        print(f"📁 Download location: {self.downloader.download_path}")
+        _emit([
+            _HEADER_BATCH_DONE,
+            f"✅ Successful: {successful}",
+            f"❌ Failed: {failed}",
+            f"📁 Download location: {self.downloader.download_path}",
+        ])
         
         return successful > 0
 
@@ -396,9 +575,9 @@ class CLIInterface:
 @click.option('--no-ai', is_flag=True,
               help='Skip AI interactions and use defaults')
 @click.option('--batch', '-b', type=str,
-              help='Batch download: provide file path with URLs or webpage URL')
+              help="Batch download: provide file path with URLs or webpage URL ('-' reads URLs from stdin)")
 @click.option('--batch-webpage', is_flag=True,
-              help='Treat --batch input as webpage to parse for video URLs')
+              help='Treat --batch input as webpage(s) to parse for video URLs (comma-separated)')
 def main(url: str, download_path: str, audio_only: bool, quality: str, no_ai: bool, 
          batch: str, batch_webpage: bool):
     """
@@ -411,29 +590,38 @@ def main(url: str, download_path: str, audio_only: bool, quality: str, no_ai: bo
       clipgenius https://www.youtube.com/watch?v=abc123
       clipgenius --batch urls.txt
       clipgenius --batch https://example.com/page --batch-webpage
+      cat urls.txt | clipgenius
     """
     try:
+        # A URL list piped in on stdin is a batch of its own
+        if not url and not batch and not sys.stdin.isatty():
+            batch = '-'
+        
         # Validate arguments
         if not url and not batch:
             click.echo("Error: Either URL or --batch option is required.")
             click.echo("Use 'clipgenius --help' for more information.")
             sys.exit(1)
         
-        # Create CLI interface
-        cli = CLIInterface()
-        
-        # Set custom download path if specified
-        if download_path != './downloads':
-            cli.downloader.download_path = download_path
-            cli.downloader.ensure_directory(download_path)
+        # Create CLI interface; heavy modules are only imported once a mode needs them
+        cli = CLIInterface(download_path=download_path, ai_enabled=not no_ai and not batch)
         
         # Handle batch mode
         if batch:
-            if os.path.isfile(batch):
-                # Read URLs from file
+            if batch == '-':
+                # stdin carries the URLs, so it can't answer prompts; use the options given
+                urls = _read_url_list(sys.stdin)
+                success = cli.run_batch_mode(urls=urls, batch_prefs={
+                    'audio_only': audio_only,
+                    'quality': quality,
+                    'subtitles': False,
+                    'thumbnail': False
+                })
+            elif os.path.isfile(batch):
+                # Read URLs from file, parsing it line by line as it is read
                 with open(batch, 'r', encoding='utf-8') as f:
-                    url_content = f.read()
-                success = cli.run_batch_mode(url_content, is_webpage=False)
+                    urls = _read_url_list(f)
+                success = cli.run_batch_mode(urls=urls)
             else:
                 # Treat as webpage URL or direct URL list
                 success = cli.run_batch_mode(batch, is_webpage=batch_webpage)
@@ -472,10 +660,10 @@ def main(url: str, download_path: str, audio_only: bool, quality: str, no_ai: bo
         cli.print_success("ClipGenius session completed! 🎉")
         
     except KeyboardInterrupt:
-        print(f"\n{Fore.YELLOW}⚠️  Download interrupted by user.{Style.RESET_ALL}")
+        click.echo("\n⚠️  Download interrupted by user.", err=True)
         sys.exit(0)
     except Exception as e:
-        print(f"{Fore.RED}❌ Unexpected error: {str(e)}{Style.RESET_ALL}")
+        click.echo(f"❌ Unexpected error: {e}", err=True)
         sys.exit(1)
 
 
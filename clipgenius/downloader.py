@@ -3,10 +3,68 @@ Video downloader module using yt-dlp
 """
 
 import os
-import yt_dlp
-from typing import Dict, List, Optional, Any
+import copy
+import heapq
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, TYPE_CHECKING
 from .utils import sanitize_filename, ensure_directory
 
+if TYPE_CHECKING:
+    import yt_dlp
+
+
+# Options for metadata-only extraction
+_INFO_OPTS = {
+    'quiet': True,
+    'no_warnings': True,
+}
+
+
+def _format_quality(fmt: Dict[str, Any]) -> float:
+    """Sort key for a yt-dlp format: its quality, with a missing one counted as 0"""
+    return fmt.get('quality') or 0
+
+
+def _organize_format(fmt: Dict[str, Any]) -> Dict[str, Any]:
+    """Pick the fields of a yt-dlp format that are shown to the user"""
+    return {
+        'format_id': fmt.get('format_id'),
+        'ext': fmt.get('ext'),
+        'resolution': fmt.get('resolution', 'audio only' if fmt.get('vcodec') == 'none' else 'unknown'),
+        'filesize': fmt.get('filesize'),
+        'acodec': fmt.get('acodec'),
+        'vcodec': fmt.get('vcodec'),
+        'format_note': fmt.get('format_note', ''),
+        'quality': fmt.get('quality', 0)
+    }
+
+
+def _yt_dlp():
+    """The yt_dlp module, imported on first use since loading its extractors is slow"""
+    import yt_dlp
+    return yt_dlp
+
+
+@lru_cache(maxsize=None)
+def _bundle_ydl_class() -> type:
+    """YoutubeDL that records a failed subtitle download and goes on with the video"""
+    yt_dlp = _yt_dlp()
+    
+    class BundleYoutubeDL(yt_dlp.YoutubeDL):
+        subtitles_error: Optional[str] = None
+        
+        def _write_subtitles(self, info_dict, filename):
+            # Subtitles are written before the video, so a failure here would
+            # otherwise abort the whole download
+            try:
+                return super()._write_subtitles(info_dict, filename)
+            except yt_dlp.utils.DownloadError as e:
+                self.subtitles_error = str(e)
+                return []
+    
+    return BundleYoutubeDL
+
 
 class VideoDownloader:
     """Handles video/audio downloading using yt-dlp"""
@@ -14,63 +72,126 @@ class VideoDownloader:
     def __init__(self, download_path: str = "./downloads"):
         self.download_path = download_path
         ensure_directory(download_path)
+        # Output template shared by every download without a custom filename
+        self._default_outtmpl = os.path.join(download_path, '%(title)s.%(ext)s')
+        # One metadata YoutubeDL per thread, so extractor setup is paid once per
+        # thread rather than per URL (batch mode extracts from a thread pool)
+        self._local = threading.local()
+    
+    def _info_ydl(self) -> 'yt_dlp.YoutubeDL':
+        """This thread's long-lived YoutubeDL for metadata extraction"""
+        ydl = getattr(self._local, 'ydl', None)
+        if ydl is None:
+            ydl = self._local.ydl = _yt_dlp().YoutubeDL(dict(_INFO_OPTS))
+        return ydl
         
-    def get_video_info(self, url: str) -> Optional[Dict[str, Any]]:
-        """Extract video information without downloading"""
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-        }
+    def extract_video_info(self, url: str, process: bool = True) -> Optional[Dict[str, Any]]:
+        """Extract video information without downloading, raising on failure
         
+        With `process=False` yt-dlp's format selection and normalisation are skipped,
+        which is enough for titles and durations but not for listing formats.
+        """
+        ydl = self._info_ydl()
+        info = ydl.extract_info(url, download=False, process=process)
+        # Unprocessed results can be a mere pointer to another URL or a playlist
+        if not process and info and info.get('_type', 'video') != 'video':
+            info = ydl.extract_info(url, download=False)
+        return info
+    
+    def get_video_info(self, url: str, process: bool = True) -> Optional[Dict[str, Any]]:
+        """Extract video information without downloading, printing any error"""
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                return info
+            return self.extract_video_info(url, process=process)
         except Exception as e:
             print(f"Error extracting video info: {str(e)}")
             return None
     
-    def get_available_formats(self, url: str) -> List[Dict[str, Any]]:
-        """Get available formats for the video"""
-        info = self.get_video_info(url)
+    def get_available_formats(self, url: str, info: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Get all available formats for the video, best first, from `info` when already extracted"""
+        info = info or self.get_video_info(url)
         if not info:
             return []
         
-        formats = info.get('formats', [])
-        # Filter and organize formats
-        organized_formats = []
-        
-        for fmt in formats:
-            format_info = {
-                'format_id': fmt.get('format_id'),
-                'ext': fmt.get('ext'),
-                'resolution': fmt.get('resolution', 'audio only' if fmt.get('vcodec') == 'none' else 'unknown'),
-                'filesize': fmt.get('filesize'),
-                'acodec': fmt.get('acodec'),
-                'vcodec': fmt.get('vcodec'),
-                'format_note': fmt.get('format_note', ''),
-                'quality': fmt.get('quality', 0)
-            }
-            organized_formats.append(format_info)
-        
         # Sort by quality (higher is better)
-        organized_formats.sort(key=lambda x: x['quality'] or 0, reverse=True)
-        return organized_formats
+        formats = sorted(info.get('formats') or [], key=_format_quality, reverse=True)
+        return [_organize_format(fmt) for fmt in formats]
+    
+    def get_top_formats(self, url: str, n: int = 10, info: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Get the `n` best formats, without sorting or organizing the rest"""
+        info = info or self.get_video_info(url)
+        if not info:
+            return []
+        
+        formats = heapq.nlargest(n, info.get('formats') or [], key=_format_quality)
+        return [_organize_format(fmt) for fmt in formats]
     
     def download_video(self, url: str, format_id: Optional[str] = None, 
                       audio_only: bool = False, custom_filename: Optional[str] = None) -> Dict[str, Any]:
         """Download video with specified options"""
+        ydl_opts = self._video_opts(format_id, audio_only, custom_filename)
+        
+        try:
+            with _yt_dlp().YoutubeDL(ydl_opts) as ydl:
+                ydl.download([url])
+                return {
+                    'success': True,
+                    'message': 'Download completed successfully!',
+                    'path': self.download_path
+                }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'message': f'Download failed: {str(e)}'
+            }
+    
+    def download_bundle(self, url: str, audio_only: bool = False, custom_filename: Optional[str] = None,
+                        subtitles: bool = False, thumbnail: bool = False,
+                        sub_langs: Optional[List[str]] = None, format_id: Optional[str] = None) -> Dict[str, Any]:
+        """Download the video together with its subtitles and thumbnail in a single yt-dlp run
+        
+        A subtitle failure does not fail the download; it is returned as `subtitles_error`.
+        """
+        ydl_opts = self._video_opts(format_id, audio_only, custom_filename)
+        if subtitles:
+            ydl_opts.update({
+                'writesubtitles': True,
+                'writeautomaticsub': True,
+                'subtitleslangs': sub_langs or ['en', 'auto'],
+            })
+        if thumbnail:
+            ydl_opts['writethumbnail'] = True
+        
+        try:
+            with _bundle_ydl_class()(ydl_opts) as ydl:
+                ydl.download([url])
+                return {
+                    'success': True,
+                    'message': 'Download completed successfully!',
+                    'path': self.download_path,
+                    # Set when the video was saved but its subtitles could not be
+                    'subtitles_error': ydl.subtitles_error
+                }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'message': f'Download failed: {str(e)}'
+            }
+    
+    def _video_opts(self, format_id: Optional[str], audio_only: bool,
+                    custom_filename: Optional[str]) -> Dict[str, Any]:
+        """Build the yt-dlp options for downloading the video itself"""
+        if custom_filename:
+            outtmpl = os.path.join(self.download_path, f'{sanitize_filename(custom_filename)}.%(ext)s')
+        else:
+            outtmpl = self._default_outtmpl
         
-        # Build yt-dlp options
         ydl_opts = {
-            'outtmpl': os.path.join(self.download_path, '%(title)s.%(ext)s'),
+            'outtmpl': outtmpl,
             'ignoreerrors': False,
         }
         
-        if custom_filename:
-            safe_filename = sanitize_filename(custom_filename)
-            ydl_opts['outtmpl'] = os.path.join(self.download_path, f'{safe_filename}.%(ext)s')
-        
         if audio_only:
             ydl_opts.update({
                 'format': 'bestaudio/best',
@@ -85,23 +206,11 @@ class VideoDownloader:
         else:
             ydl_opts['format'] = 'best'
         
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
-                return {
-                    'success': True,
-                    'message': 'Download completed successfully!',
-                    'path': self.download_path
-                }
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e),
-                'message': f'Download failed: {str(e)}'
-            }
+        return ydl_opts
     
-    def download_subtitles(self, url: str, languages: List[str] = None) -> Dict[str, Any]:
-        """Download subtitles for the video"""
+    def download_subtitles(self, url: str, languages: List[str] = None,
+                           info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Download subtitles for the video, reusing `info` when already extracted"""
         if languages is None:
             languages = ['en', 'auto']
         
@@ -110,17 +219,16 @@ class VideoDownloader:
             'writeautomaticsub': True,
             'subtitleslangs': languages,
             'skip_download': True,
-            'outtmpl': os.path.join(self.download_path, '%(title)s.%(ext)s'),
+            'outtmpl': self._default_outtmpl,
         }
         
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
-                return {
-                    'success': True,
-                    'message': 'Subtitles downloaded successfully!',
-                    'path': self.download_path
-                }
+            self._download(ydl_opts, url, info)
+            return {
+                'success': True,
+                'message': 'Subtitles downloaded successfully!',
+                'path': self.download_path
+            }
         except Exception as e:
             return {
                 'success': False,
@@ -128,25 +236,33 @@ class VideoDownloader:
                 'message': f'Subtitle download failed: {str(e)}'
             }
     
-    def download_thumbnail(self, url: str) -> Dict[str, Any]:
-        """Download video thumbnail"""
+    def download_thumbnail(self, url: str, info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Download video thumbnail, reusing `info` when already extracted"""
         ydl_opts = {
             'writethumbnail': True,
             'skip_download': True,
-            'outtmpl': os.path.join(self.download_path, '%(title)s.%(ext)s'),
+            'outtmpl': self._default_outtmpl,
         }
         
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
-                return {
-                    'success': True,
-                    'message': 'Thumbnail downloaded successfully!',
-                    'path': self.download_path
-                }
+            self._download(ydl_opts, url, info)
+            return {
+                'success': True,
+                'message': 'Thumbnail downloaded successfully!',
+                'path': self.download_path
+            }
         except Exception as e:
             return {
                 'success': False,
                 'error': str(e),
                 'message': f'Thumbnail download failed: {str(e)}'
-            }
\ No newline at end of file
+            }
+    
+    def _download(self, ydl_opts: Dict[str, Any], url: str, info: Optional[Dict[str, Any]] = None):
+        """Run yt-dlp for `url`, processing a pre-extracted `info` instead of fetching it again"""
+        with _yt_dlp().YoutubeDL(ydl_opts) as ydl:
+            if info:
+                # Processing mutates the dict, and callers keep theirs cached
+                ydl.process_ie_result(copy.deepcopy(info), download=True)
+            else:
+                ydl.download([url])
\ No newline at end of file
@@ -4,36 +4,116 @@ Utility functions for ClipGenius
 
 import os
 import re
+from functools import lru_cache
 from typing import Optional
 from urllib.parse import urlparse
 
 
+# URLs with these prefixes have their host read by plain string splitting
+_HTTP_PREFIXES = ('https://', 'http://')
+
+# YouTube hosts, matched exactly or as a parent domain (e.g. m.youtube.com)
+_YOUTUBE_DOMAINS = ('youtube.com', 'youtu.be')
+_YOUTUBE_SUFFIXES = tuple('.' + domain for domain in _YOUTUBE_DOMAINS)
+
+# Units for format_file_size, each 1024 times the previous one
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+# Characters dropped from suggested filenames, and runs of whitespace to collapse
+_FILENAME_STRIP_RE = re.compile(r'[^\w\s-]+')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Characters that are problematic in filenames, each mapped to '_'
+_SANITIZE_TABLE = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
+
+
+def _fast_host(url: str) -> Optional[str]:
+    """Lowercased host of a plain http(s) URL, or None when urlparse is needed"""
+    if not url.startswith(_HTTP_PREFIXES):
+        return None
+    netloc = url.split('/', 3)[2]
+    # Credentials, IPv6 literals and query/fragment without a path need real parsing
+    if not netloc or any(c in netloc for c in '@[?#\\'):
+        return None
+    return netloc.partition(':')[0].lower()
+
+
 def is_valid_url(url: str) -> bool:
     """Check if the provided string is a valid URL"""
+    # Only strings are cached; anything else (e.g. a list) is simply not a URL
+    return isinstance(url, str) and _is_valid_url(url)
+
+
+def is_youtube_url(url: str) -> bool:
+    """Check if URL is from YouTube"""
+    return isinstance(url, str) and _is_youtube_url(url)
+
+
+# URL checks are pure, so repeated checks of the same URL (e.g. across batch
+# parsing and the download loop) are answered from a small bounded cache
+@lru_cache(maxsize=1024)
+def _is_valid_url(url: str) -> bool:
+    """Cached body of is_valid_url"""
     try:
+        if _fast_host(url):
+            return True
         result = urlparse(url)
         return all([result.scheme, result.netloc])
     except Exception:
         return False
 
 
-def is_youtube_url(url: str) -> bool:
-    """Check if URL is from YouTube"""
-    youtube_domains = ['youtube.com', 'youtu.be', 'www.youtube.com', 'm.youtube.com']
+@lru_cache(maxsize=1024)
+def _is_youtube_url(url: str) -> bool:
+    """Cached body of is_youtube_url"""
     try:
-        domain = urlparse(url).netloc.lower()
-        return any(yt_domain in domain for yt_domain in youtube_domains)
+        host = _fast_host(url)
+        if host is None:
+            host = urlparse(url).hostname or ''
+        return host in _YOUTUBE_DOMAINS or host.endswith(_YOUTUBE_SUFFIXES)
     except Exception:
         return False
 
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for safe file system usage"""
-    # Remove or replace characters that are problematic in filenames
-    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
-    # Remove extra whitespace and limit length
-    filename = ' '.join(filename.split())[:200]
-    return filename
+    # Replace problematic characters, collapse whitespace and limit length
+    return ' '.join(filename.translate(_SANITIZE_TABLE).split())[:200]
+
+
+def suggest_filename(video_info: dict) -> str:
+    """Suggest a custom filename based on video content"""
+    title = video_info.get('title', 'unknown')
+    uploader = video_info.get('uploader', 'unknown')
+    duration = video_info.get('duration', 0)
+    
+    # Create a descriptive filename
+    filename_parts = []
+    
+    if uploader and uploader.lower() != 'unknown':
+        filename_parts.append(uploader[:20])  # Limit uploader name length
+    
+    if title and title.lower() != 'unknown':
+        # Clean and truncate title
+        clean_title = _WHITESPACE_RE.sub(' ', _FILENAME_STRIP_RE.sub('', title)).strip()
+        filename_parts.append(clean_title[:50])  # Limit title length
+    
+    if duration and duration > 0:
+        minutes = duration // 60
+        if minutes > 60:
+            hours = minutes // 60
+            minutes = minutes % 60
+            filename_parts.append(f"{hours}h{minutes}m")
+        else:
+            filename_parts.append(f"{minutes}m")
+    
+    suggested_name = " - ".join(filename_parts)
+    
+    # Fallback if nothing useful was found
+    if not suggested_name or suggested_name.strip() == "":
+        suggested_name = "video_download"
+    
+    return suggested_name
 
 
 def format_duration(seconds: Optional[int]) -> str:
@@ -53,16 +133,16 @@ def format_duration(seconds: Optional[int]) -> str:
         return f"{secs}s"
 
 
-def format_file_size(bytes_size: Optional[int]) -> str:
-    """Format file size in bytes to human readable format"""
+def format_file_size(bytes_size: Optional[int], sep: str = ' ') -> str:
+    """Format file size in bytes to human readable format, with `sep` before the unit"""
     if bytes_size is None:
         return "Unknown"
+    if bytes_size < 1024:
+        return f"{bytes_size:.1f}{sep}B"
     
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if bytes_size < 1024.0:
-            return f"{bytes_size:.1f} {unit}"
-        bytes_size /= 1024.0
-    return f"{bytes_size:.1f} TB"
+    # Each unit is 2**10 of the previous one, so the bit length picks it directly
+    unit = min((int(bytes_size).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{bytes_size / (1 << (unit * 10)):.1f}{sep}{_SIZE_UNITS[unit]}"
 
 
 def get_openai_api_key() -> Optional[str]:
@@ -70,6 +150,11 @@ def get_openai_api_key() -> Optional[str]:
     return os.getenv('OPENAI_API_KEY')
 
 
+def get_openai_model() -> Optional[str]:
+    """Get the OpenAI chat model override from environment variables"""
+    return os.getenv('CLIPGENIUS_MODEL')
+
+
 def ensure_directory(path: str) -> None:
     """Ensure directory exists, create if it doesn't"""
     os.makedirs(path, exist_ok=True)
\ No newline at end of file